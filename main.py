@@ -1,42 +1,135 @@
 from __future__ import annotations
 
+import copy
 import json
-from dataclasses import dataclass
-from datetime import date, datetime, timedelta
+import os
+import re
+import stat
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from operator import attrgetter
 from pathlib import Path
-from collections import defaultdict
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, TypeVar
 
-import altair as alt
-import pandas as pd
+import numpy as np
 import streamlit as st
-from icalendar import Calendar
+
+if TYPE_CHECKING:
+    # pandas takes a few hundred ms to import, so it is only loaded when the
+    # chart frames are built, after the inputs are already shown. Loading the
+    # plan and expanding holiday days stay on NumPy and the stdlib.
+    import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # orjson is only a speedup; fall back to the stdlib.
+    orjson = None
+
+T = TypeVar("T")
 
 DEFAULT_INTERVAL_WEEKS = 6
 PLAN_PATH = Path(".streamlit/last_plan.json")
+_ICS_FOLD = re.compile(r"\r?\n[ \t]")
+_ICS_LINE = re.compile(r"\r?\n")
+_ICS_DATE = re.compile(r"(\d{4})(\d{2})(\d{2})")
+_ICS_ESCAPE = re.compile(r"\\([\\;,:nN])")
+_PARENT_COLORS = ("#8fb339", "#3f88c5", "#f26419")
+
+_BLOCK_LAYER_SPEC: Dict[str, Any] = {
+    "transform": [
+        {
+            "calculate": "utcOffset('day', toDate(datum.end_inclusive), 1)",
+            "as": "end_exclusive",
+        }
+    ],
+    "mark": {"type": "bar", "cornerRadius": 4},
+    "encoding": {
+        "x": {"field": "start", "type": "temporal", "title": "Calendar date"},
+        "x2": {"field": "end_exclusive"},
+        "y": {"field": "parent", "type": "nominal", "title": ""},
+        "color": {"field": "parent", "type": "nominal", "legend": {"title": ""}},
+        "tooltip": [
+            {"field": "label", "type": "nominal", "title": "Block"},
+            {"field": "start", "type": "temporal", "title": "Start"},
+            {"field": "end_inclusive", "type": "temporal", "title": "End"},
+            {"field": "weeks", "type": "quantitative", "title": "Weeks"},
+            {"field": "days", "type": "quantitative", "title": "Days"},
+            {"field": "holiday_count", "type": "quantitative", "title": "Holidays"},
+            {
+                "field": "holiday_dates_display",
+                "type": "nominal",
+                "title": "Holiday dates",
+            },
+        ],
+    },
+}
+_HOLIDAY_LAYER_SPEC: Dict[str, Any] = {
+    "mark": {
+        "type": "rule",
+        "color": "#d90429",
+        "strokeWidth": 2,
+        "strokeDash": [6, 3],
+        "opacity": 0.8,
+    },
+    "encoding": {
+        "x": {"field": "date", "type": "temporal"},
+        "tooltip": [
+            {"field": "label", "type": "nominal", "title": "Holiday"},
+            {"field": "date", "type": "temporal", "title": "Date"},
+            {"field": "covered_blocks", "type": "nominal", "title": "Within blocks"},
+        ],
+    },
+}
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class IntervalInput:
     start_date: date
     duration_weeks: float
     name: Optional[str] = None
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "start_date": self.start_date.isoformat(),
-            "duration_weeks": float(self.duration_weeks),
-            "name": self.name,
-        }
+
+_interval_fields = attrgetter("start_date", "duration_weeks", "name")
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LeaveRecord:
     parent: str
     label: str
     start: date
     end: date
     duration_weeks: float
+    # Day ordinals of start/end, so overlap detection can compare plain ints.
+    start_ord: int = field(init=False, repr=False, compare=False)
+    end_ord: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "start_ord", self.start.toordinal())
+        object.__setattr__(self, "end_ord", self.end.toordinal())
+
+
+@dataclass(slots=True, frozen=True)
+class LeaveColumns:
+    parent: Tuple[str, ...]
+    label: Tuple[str, ...]
+    start: Tuple[date, ...]
+    end: Tuple[date, ...]
+    duration_weeks: Tuple[float, ...]
+
+    @classmethod
+    def from_records(cls, records: List[LeaveRecord]) -> LeaveColumns:
+        return cls(
+            parent=tuple(record.parent for record in records),
+            label=tuple(record.label for record in records),
+            start=tuple(record.start for record in records),
+            end=tuple(record.end for record in records),
+            duration_weeks=tuple(record.duration_weeks for record in records),
+        )
+
+
+def _add_days(day: date, days: int) -> date:
+    return date.fromordinal(day.toordinal() + days)
 
 
 def duration_weeks_to_days(duration_weeks: float) -> int:
@@ -47,14 +140,14 @@ def compute_inclusive_end(start: date, duration_weeks: float) -> date:
     total_days = duration_weeks_to_days(duration_weeks)
     if total_days <= 0:
         return start
-    return start + timedelta(days=total_days - 1)
+    return _add_days(start, total_days - 1)
 
 
 def add_working_days(start: date, working_days: int) -> date:
     current = start
     days_added = 0
     while days_added < working_days:
-        current += timedelta(days=1)
+        current = _add_days(current, 1)
         if current.weekday() < 5:  # Monday=0, Sunday=6
             days_added += 1
     return current
@@ -70,6 +163,46 @@ def rerun_app() -> None:
             legacy()
 
 
+def session_memo(name: str, key: Any, build: Callable[[], T]) -> T:
+    # Streamlit re-executes this module on every rerun, so dataclass instances
+    # from the previous run never compare equal to new ones. Keys must be
+    # built from plain values (dates, floats, strings, tuples).
+    state_key = f"{name}-memo"
+    memo = st.session_state.get(state_key)
+    if memo is not None and memo[0] == key:
+        return memo[1]
+    value = build()
+    st.session_state[state_key] = (key, value)
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, IntervalInput):
+        start_date, duration_weeks, name = _interval_fields(value)
+        return {
+            "start_date": start_date.isoformat(),
+            "duration_weeks": duration_weeks,
+            "name": name,
+        }
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps_plan(payload: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    return json.dumps(
+        payload, indent=2, ensure_ascii=False, default=_json_default
+    ).encode("utf-8")
+
+
+def _loads_plan(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def interval_from_dict(data: Dict[str, Any]) -> IntervalInput:
     start = date.fromisoformat(data["start_date"])
     duration = float(data.get("duration_weeks", 0))
@@ -77,11 +210,11 @@ def interval_from_dict(data: Dict[str, Any]) -> IntervalInput:
     return IntervalInput(start, duration, name)
 
 
-def load_saved_plan() -> Optional[Dict[str, Any]]:
-    if not PLAN_PATH.exists():
-        return None
+@st.cache_data(show_spinner=False)
+def load_saved_plan(mtime: float) -> Optional[Dict[str, Any]]:
+    # ``mtime`` only keys the cache, so saving the plan invalidates it.
     try:
-        raw = json.loads(PLAN_PATH.read_text())
+        raw = _loads_plan(PLAN_PATH.read_bytes())
         birth_date = date.fromisoformat(raw["birth_date"])
 
         def parse_intervals(*keys: str) -> List[IntervalInput]:
@@ -117,11 +250,22 @@ def load_saved_plan() -> Optional[Dict[str, Any]]:
             ),
             "holidays": holidays,
         }
+    except FileNotFoundError:
+        return None
     except Exception:
         st.warning("Saved plan could not be read. Starting with defaults.")
         return None
 
 
+def _plan_file_mode() -> int:
+    try:
+        return stat.S_IMODE(PLAN_PATH.stat().st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
 def save_plan(
     birth_date: date,
     caregiver_a_intervals: List[IntervalInput],
@@ -131,32 +275,136 @@ def save_plan(
     holidays: List[LeaveRecord],
 ) -> None:
     payload = {
-        "birth_date": birth_date.isoformat(),
-        "caregiver-a": [interval.to_dict() for interval in caregiver_a_intervals],
-        "caregiver-b": [interval.to_dict() for interval in caregiver_b_intervals],
+        "birth_date": birth_date,
+        # IntervalInput dataclasses are serialized field by field.
+        "caregiver-a": caregiver_a_intervals,
+        "caregiver-b": caregiver_b_intervals,
         "caregiver_a_name": caregiver_a_name,
         "caregiver_b_name": caregiver_b_name,
         "holidays": [
             {
                 "label": holiday.label,
-                "start": holiday.start.isoformat(),
-                "end": holiday.end.isoformat(),
+                "start": holiday.start,
+                "end": holiday.end,
             }
             for holiday in holidays
         ],
     }
     PLAN_PATH.parent.mkdir(parents=True, exist_ok=True)
-    PLAN_PATH.write_text(json.dumps(payload, indent=2))
+    # Write next to the plan and swap it in, so a concurrent load never sees
+    # a half-written file. A unique temp name keeps two sessions saving at
+    # once from writing into the same temp file.
+    fd, tmp_name = tempfile.mkstemp(
+        dir=PLAN_PATH.parent, prefix=f".{PLAN_PATH.stem}-", suffix=".tmp"
+    )
+    try:
+        # mkstemp creates the file as 0600; keep the mode a plain write would
+        # give: the current plan's, or the umask default for a first save.
+        os.chmod(tmp_name, _plan_file_mode())
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(_dumps_plan(payload))
+        os.replace(tmp_name, PLAN_PATH)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _holiday_record(
+    label: str, start_date: date, end_date: Optional[date]
+) -> LeaveRecord:
+    # DTEND is exclusive for all-day events; a missing DTEND means a single day.
+    if end_date is None:
+        end_date = start_date
+    elif end_date > start_date:
+        end_date = _add_days(end_date, -1)
+    if end_date < start_date:
+        end_date = start_date
+    return LeaveRecord(
+        parent="Bank holidays",
+        label=label,
+        start=start_date,
+        end=end_date,
+        duration_weeks=((end_date - start_date).days + 1) / 7,
+    )
 
 
-def parse_bank_holidays(uploaded_file: Optional[st.runtime.uploaded_file_manager.UploadedFile]) -> List[LeaveRecord]:
-    if not uploaded_file:
-        return []
+def _ics_date(value: str) -> date:
+    match = _ICS_DATE.match(value)
+    if not match:
+        raise ValueError(f"Unsupported date value: {value!r}")
+    return date(int(match[1]), int(match[2]), int(match[3]))
+
+
+def _unescape_ics_text(match: re.Match[str]) -> str:
+    char = match.group(1)
+    return "\n" if char in "nN" else char
+
+
+def _parse_ics_fast(raw: bytes) -> Optional[List[LeaveRecord]]:
+    """Scan VEVENT DTSTART/DTEND/SUMMARY lines without building a Calendar.
+
+    Returns None when the file needs the full icalendar parser instead.
+    """
     try:
-        calendar = Calendar.from_ical(uploaded_file.getvalue())
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return None
+    if "BEGIN:VCALENDAR" not in text.upper():
+        return None
+
+    records: List[LeaveRecord] = []
+    properties: Optional[Dict[str, str]] = None
+    nested_depth = 0
+    event_count = 0
+    # Content lines end in CRLF only; str.splitlines() would also split on
+    # U+2028, U+0085, form feeds and the like inside a SUMMARY.
+    for line in _ICS_LINE.split(_ICS_FOLD.sub("", text)):
+        marker = line.strip().upper()
+        if marker == "BEGIN:VEVENT":
+            properties = {}
+            nested_depth = 0
+        elif properties is None:
+            continue
+        elif marker == "END:VEVENT":
+            event_count += 1
+            if "DTSTART" in properties:
+                try:
+                    start_date = _ics_date(properties["DTSTART"])
+                    end_date = (
+                        _ics_date(properties["DTEND"])
+                        if "DTEND" in properties
+                        else None
+                    )
+                except ValueError:
+                    return None
+                label = _ICS_ESCAPE.sub(
+                    _unescape_ics_text,
+                    properties.get("SUMMARY", f"Holiday {event_count}"),
+                )
+                records.append(_holiday_record(label, start_date, end_date))
+            properties = None
+        # Skip the properties of sub-components such as VALARM.
+        elif marker.startswith("BEGIN:"):
+            nested_depth += 1
+        elif marker.startswith("END:"):
+            nested_depth -= 1
+        elif not nested_depth:
+            name, _, value = line.partition(":")
+            if '"' in name:
+                return None
+            prop = name.split(";", 1)[0].upper()
+            if prop in ("DTSTART", "DTEND", "SUMMARY"):
+                properties.setdefault(prop, value)
+    return records
+
+
+def _parse_ics_full(raw: bytes) -> Optional[List[LeaveRecord]]:
+    from icalendar import Calendar
+
+    try:
+        calendar = Calendar.from_ical(raw)
     except Exception:
-        st.warning("Unable to read the provided .ics file.")
-        return []
+        return None
 
     def _to_date(value: Any) -> date:
         if isinstance(value, datetime):
@@ -171,39 +419,47 @@ def parse_bank_holidays(uploaded_file: Optional[st.runtime.uploaded_file_manager
         if not start_component:
             continue
         start_date = _to_date(component.decoded("dtstart"))
+        end_date = (
+            _to_date(component.decoded("dtend")) if component.get("dtend") else None
+        )
+        summary = str(component.get("summary", f"Holiday {idx + 1}"))
+        records.append(_holiday_record(summary, start_date, end_date))
+    return records
 
-        end_component = component.get("dtend")
-        if end_component:
-            end_date = _to_date(component.decoded("dtend"))
-            if end_date > start_date:
-                end_date = end_date - timedelta(days=1)
-        else:
-            end_date = start_date
 
-        if end_date < start_date:
-            end_date = start_date
-        duration_weeks = ((end_date - start_date).days + 1) / 7
-        summary = str(component.get("summary", f"Holiday {idx + 1}"))
-        records.append(
-            LeaveRecord(
-                parent="Bank holidays",
-                label=summary,
-                start=start_date,
-                end=end_date,
-                duration_weeks=duration_weeks,
-            )
-        )
+@st.cache_data(show_spinner=False)
+def _parse_ics_bytes(raw: bytes) -> Optional[List[LeaveRecord]]:
+    records = _parse_ics_fast(raw)
+    if records is not None:
+        return records
+    return _parse_ics_full(raw)
+
+
+def parse_bank_holidays(uploaded_file: Optional[st.runtime.uploaded_file_manager.UploadedFile]) -> List[LeaveRecord]:
+    if not uploaded_file:
+        return []
+    records = _parse_ics_bytes(uploaded_file.getvalue())
+    if records is None:
+        st.warning("Unable to read the provided .ics file.")
+        return []
     return records
 
 
-def holiday_lookup(holidays: List[LeaveRecord]) -> Dict[date, List[str]]:
-    lookup: Dict[date, List[str]] = defaultdict(list)
-    for holiday in holidays:
-        current = holiday.start
-        while current <= holiday.end:
-            lookup[current].append(holiday.label)
-            current += timedelta(days=1)
-    return lookup
+def holiday_days(holidays: List[LeaveRecord]) -> Tuple[date, ...]:
+    # The chart only needs which days are holidays, not their labels.
+    # Day-resolution datetime64 covers years 1-9999, unlike nanosecond
+    # pd.date_range, so far-off calendar entries cannot overflow.
+    if not holidays:
+        return ()
+    days = np.concatenate(
+        [
+            np.arange(
+                np.datetime64(holiday.start, "D"), np.datetime64(holiday.end, "D") + 1
+            )
+            for holiday in holidays
+        ]
+    )
+    return tuple(np.unique(days).tolist())
 
 
 def collect_interval_inputs(
@@ -250,7 +506,7 @@ def collect_interval_inputs(
                 default_start = birth_date
             else:
                 prev_end = compute_inclusive_end(previous_start, previous_duration)
-                default_start = prev_end + timedelta(days=1)
+                default_start = _add_days(prev_end, 1)
             interval_start = st.date_input(
                 f"Block {interval_number} start date",
                 value=default_start,
@@ -359,158 +615,189 @@ def build_records(
 def build_overlap_records(
     caregiver_a: List[LeaveRecord], caregiver_b: List[LeaveRecord]
 ) -> List[LeaveRecord]:
+    # Sweep both caregivers' blocks in start order. A block overlaps exactly the
+    # other caregiver's blocks that are still running when it starts.
+    sides = (caregiver_a, caregiver_b)
+    events = sorted(
+        (record.start_ord, side, idx)
+        for side, records in enumerate(sides)
+        for idx, record in enumerate(records)
+    )
+    running: Tuple[List[int], List[int]] = ([], [])
+    pairs: List[Tuple[int, int]] = []
+    for start, side, idx in events:
+        other = 1 - side
+        other_records = sides[other]
+        running[other][:] = [
+            other_idx
+            for other_idx in running[other]
+            if other_records[other_idx].end_ord >= start
+        ]
+        pairs.extend(
+            (idx, other_idx) if side == 0 else (other_idx, idx)
+            for other_idx in running[other]
+        )
+        running[side].append(idx)
+
     overlaps: List[LeaveRecord] = []
-    for a_record in caregiver_a:
-        for b_record in caregiver_b:
-            overlap_start = max(a_record.start, b_record.start)
-            overlap_end = min(a_record.end, b_record.end)
-            if overlap_start <= overlap_end:
-                duration_days = (overlap_end - overlap_start).days + 1
-                duration_weeks = duration_days / 7
-                overlaps.append(
-                    LeaveRecord(
-                        parent="Overlap",
-                        label=f"{a_record.label} ∩ {b_record.label}",
-                        start=overlap_start,
-                        end=overlap_end,
-                        duration_weeks=duration_weeks,
-                    )
-                )
+    for a_idx, b_idx in sorted(pairs):
+        a_record = caregiver_a[a_idx]
+        b_record = caregiver_b[b_idx]
+        overlap_start = max(a_record.start_ord, b_record.start_ord)
+        overlap_end = min(a_record.end_ord, b_record.end_ord)
+        overlaps.append(
+            LeaveRecord(
+                parent="Overlap",
+                label=f"{a_record.label} ∩ {b_record.label}",
+                start=date.fromordinal(overlap_start),
+                end=date.fromordinal(overlap_end),
+                duration_weeks=(overlap_end - overlap_start + 1) / 7,
+            )
+        )
     return overlaps
 
 
+def build_timeline_records(
+    caregiver_a_name: str,
+    caregiver_a_intervals: List[IntervalInput],
+    caregiver_b_name: str,
+    caregiver_b_intervals: List[IntervalInput],
+) -> List[LeaveRecord]:
+    caregiver_a_records = build_records(caregiver_a_name, caregiver_a_intervals)
+    caregiver_b_records = build_records(caregiver_b_name, caregiver_b_intervals)
+    overlap_records = build_overlap_records(caregiver_a_records, caregiver_b_records)
+    return caregiver_a_records + caregiver_b_records + overlap_records
+
+
+@st.cache_data(show_spinner=False)
+def _build_chart_frames(
+    columns: LeaveColumns,
+    holiday_days: Tuple[date, ...],
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    import pandas as pd
+
+    holiday_dates = np.array(holiday_days, dtype="datetime64[D]")
+    holiday_isoformats = np.datetime_as_string(holiday_dates, unit="D").tolist()
+    block_starts = np.array(columns.start, dtype="datetime64[D]")
+    block_ends = np.array(columns.end, dtype="datetime64[D]")
+    first = np.searchsorted(holiday_dates, block_starts)
+    stop = np.searchsorted(holiday_dates, block_ends, side="right")
+    durations = np.array(columns.duration_weeks, dtype=np.float64)
+    block_holidays = [holiday_isoformats[lo:hi] for lo, hi in zip(first, stop)]
+
+    df = pd.DataFrame(
+        {
+            "parent": np.array(columns.parent, dtype=object),
+            "label": np.array(columns.label, dtype=object),
+            "start": np.array(columns.start, dtype=object),
+            "end_inclusive": np.array(columns.end, dtype=object),
+            "weeks": durations.round(1),
+            "days": np.clip(np.rint(durations * 7), 0, None).astype(np.int64),
+            "holiday_count": stop - first,
+            "holiday_dates_display": [
+                ", ".join(dates) if dates else "None" for dates in block_holidays
+            ],
+        }
+    )
+    # The summary table is cast to Arrow-backed columns here, once per plan,
+    # so st.table can serialize it without an object -> Arrow pass per rerun.
+    table_df = (
+        df[
+            [
+                "label",
+                "start",
+                "end_inclusive",
+                "weeks",
+                "days",
+                "holiday_count",
+                "holiday_dates_display",
+            ]
+        ]
+        .rename(
+            columns={
+                "end_inclusive": "end",
+                "holiday_count": "holidays",
+                "holiday_dates_display": "holiday dates",
+            }
+        )
+        .astype(
+            {
+                "label": "string[pyarrow]",
+                "start": "date32[pyarrow]",
+                "end": "date32[pyarrow]",
+                "weeks": "double[pyarrow]",
+                "days": "int64[pyarrow]",
+                "holidays": "int64[pyarrow]",
+                "holiday dates": "string[pyarrow]",
+            }
+        )
+        .set_index("label")
+    )
+    return df, table_df
+
+
+@st.cache_data(show_spinner=False)
+def _build_chart_spec(
+    used_parents: Tuple[str, ...], with_holidays: bool
+) -> Dict[str, Any]:
+    block_layer = copy.deepcopy(_BLOCK_LAYER_SPEC)
+    block_layer["encoding"]["y"]["sort"] = list(used_parents)
+    block_layer["encoding"]["color"]["scale"] = {
+        "domain": list(used_parents),
+        "range": list(_PARENT_COLORS[: len(used_parents)]),
+    }
+    if with_holidays:
+        holiday_layer = copy.deepcopy(_HOLIDAY_LAYER_SPEC)
+        holiday_layer["data"] = {"name": "holidays"}
+        spec = {"layer": [holiday_layer, block_layer]}
+    else:
+        spec = block_layer
+    spec["height"] = 180
+    return spec
+
+
+def _build_holiday_markers(
+    df: pd.DataFrame, holidays: List[LeaveRecord]
+) -> pd.DataFrame:
+    import pandas as pd
+
+    holiday_df = pd.DataFrame(
+        [{"date": holiday.start, "label": holiday.label} for holiday in holidays]
+    )
+    min_date = df["start"].min()
+    max_date = df["end_inclusive"].max()
+    holiday_df = holiday_df[
+        (holiday_df["date"] >= min_date) & (holiday_df["date"] <= max_date)
+    ]
+    block_labels = df["label"].to_numpy()
+    block_starts = np.array(df["start"], dtype="datetime64[D]")
+    block_ends = np.array(df["end_inclusive"], dtype="datetime64[D]")
+    marker_days = np.array(holiday_df["date"], dtype="datetime64[D]")[:, None]
+    covered = (block_starts <= marker_days) & (block_ends >= marker_days)
+    holiday_df["covered_blocks"] = [
+        ", ".join(block_labels[row]) or "None" for row in covered
+    ]
+    return holiday_df
+
+
 def render_chart(
     records: List[LeaveRecord],
     holidays: List[LeaveRecord],
-    holiday_lookup_map: Dict[date, List[str]],
+    holiday_days: Tuple[date, ...],
 ) -> None:
     if not records:
         st.info("Add at least one leave interval to view the timeline.")
         return
 
-    df = pd.DataFrame(
-        [
-            {
-                "parent": record.parent,
-                "label": record.label,
-                "start": record.start,
-                "end_inclusive": record.end,
-                "end_exclusive": record.end + timedelta(days=1),
-                "duration_weeks": record.duration_weeks,
-            }
-            for record in records
-        ]
-    )
-    df["weeks"] = df["duration_weeks"].apply(lambda value: round(value, 1))
-    df["days"] = df["duration_weeks"].apply(duration_weeks_to_days)
-
-    def labels_for_block(row: pd.Series) -> List[str]:
-        labels: set[str] = set()
-        current = row["start"]
-        while current <= row["end_inclusive"]:
-            for label in holiday_lookup_map.get(current, []):
-                labels.add(label)
-            current += timedelta(days=1)
-        return sorted(labels)
-
-    def dates_for_block(row: pd.Series) -> List[str]:
-        dates: List[date] = []
-        current = row["start"]
-        while current <= row["end_inclusive"]:
-            if holiday_lookup_map.get(current):
-                dates.append(current)
-            current += timedelta(days=1)
-        unique_dates = sorted(set(dates))
-        return [d.isoformat() for d in unique_dates]
-
-    df["holiday_dates"] = df.apply(dates_for_block, axis=1)
-    df["holiday_count"] = df["holiday_dates"].apply(len)
-    df["holiday_dates_display"] = df["holiday_dates"].apply(
-        lambda dates: ", ".join(dates) if dates else "None"
-    )
-
-    parent_order = df["parent"].unique().tolist()
-    used_parents = [p for p in parent_order if p in df["parent"].unique()]
-    color_scale = alt.Scale(
-        domain=used_parents,
-        range=["#8fb339", "#3f88c5", "#f26419"][: len(used_parents)],
-    )
+    df, table_df = _build_chart_frames(LeaveColumns.from_records(records), holiday_days)
 
-    base_chart = (
-        alt.Chart(df)
-        .mark_bar(cornerRadius=4)
-        .encode(
-            x=alt.X("start:T", title="Calendar date"),
-            x2="end_exclusive:T",
-            y=alt.Y("parent:N", sort=used_parents, title=""),
-            color=alt.Color("parent:N", scale=color_scale, legend=alt.Legend(title="")),
-            tooltip=[
-                alt.Tooltip("label:N", title="Block"),
-                alt.Tooltip("start:T", title="Start"),
-                alt.Tooltip("end_inclusive:T", title="End"),
-                alt.Tooltip("weeks:Q", title="Weeks"),
-                alt.Tooltip("days:Q", title="Days"),
-                alt.Tooltip("holiday_count:Q", title="Holidays"),
-                alt.Tooltip("holiday_dates_display:N", title="Holiday dates"),
-            ],
-        )
-        .properties(height=180)
-    )
+    used_parents = tuple(dict.fromkeys(record.parent for record in records))
+    spec = _build_chart_spec(used_parents, bool(holidays))
     if holidays:
-        holiday_df = pd.DataFrame(
-            [{"date": holiday.start, "label": holiday.label} for holiday in holidays]
-        )
-        min_date = df["start"].min()
-        max_date = df["end_inclusive"].max()
-        holiday_df = holiday_df[
-            (holiday_df["date"] >= min_date) & (holiday_df["date"] <= max_date)
-        ]
-        block_ranges = df[["label", "start", "end_inclusive"]]
-
-        def coverage_for(date_value: date) -> str:
-            matches = block_ranges[
-                (block_ranges["start"] <= date_value)
-                & (block_ranges["end_inclusive"] >= date_value)
-            ]["label"].tolist()
-            return ", ".join(matches) if matches else "None"
-
-        holiday_df["covered_blocks"] = holiday_df["date"].apply(coverage_for)
-
-        holiday_layer = (
-            alt.Chart(holiday_df)
-            .mark_rule(color="#d90429", strokeWidth=2, strokeDash=[6, 3], opacity=0.8)
-            .encode(
-                x=alt.X("date:T"),
-                tooltip=[
-                    alt.Tooltip("label:N", title="Holiday"),
-                    alt.Tooltip("date:T", title="Date"),
-                    alt.Tooltip("covered_blocks:N", title="Within blocks"),
-                ],
-            )
-        )
-        chart = alt.layer(holiday_layer, base_chart)
-    else:
-        chart = base_chart
+        spec["datasets"] = {"holidays": _build_holiday_markers(df, holidays)}
 
-    st.altair_chart(chart, use_container_width=True)
-    table_df = df[
-        [
-            "label",
-            "start",
-            "end_inclusive",
-            "weeks",
-            "days",
-            "holiday_count",
-            "holiday_dates_display",
-        ]
-    ].rename(
-        columns={
-            "end_inclusive": "end",
-            "holiday_count": "holidays",
-            "holiday_dates_display": "holiday dates",
-        }
-    )
-    st.dataframe(table_df, use_container_width=True, hide_index=True)
+    st.vega_lite_chart(df, spec, use_container_width=True)
+    st.table(table_df)
 
 
 def main() -> None:
@@ -521,7 +808,11 @@ def main() -> None:
         "to visualize coverage and overlap."
     )
 
-    saved_plan = load_saved_plan()
+    try:
+        plan_mtime = PLAN_PATH.stat().st_mtime
+    except OSError:
+        plan_mtime = 0.0
+    saved_plan = load_saved_plan(plan_mtime)
     default_birth = saved_plan["birth_date"] if saved_plan else date.today()
     birth_date = st.date_input("Date of birth", value=default_birth)
     if saved_plan:
@@ -548,7 +839,11 @@ def main() -> None:
     else:
         holidays = stored_holidays
 
-    holiday_lookup_map = holiday_lookup(holidays)
+    covered_holiday_days = session_memo(
+        "holiday-days",
+        tuple((holiday.label, holiday.start, holiday.end) for holiday in holidays),
+        lambda: holiday_days(holidays),
+    )
     if holiday_file:
         if not uploaded_holidays:
             st.warning("No valid events found in the provided calendar.")
@@ -572,13 +867,24 @@ def main() -> None:
         saved_plan["caregiver-b"] if saved_plan else None,
     )
 
-    caregiver_a_records = build_records(caregiver_a_name, caregiver_a_intervals)
-    caregiver_b_records = build_records(caregiver_b_name, caregiver_b_intervals)
-    overlap_records = build_overlap_records(caregiver_a_records, caregiver_b_records)
-    all_records = caregiver_a_records + caregiver_b_records + overlap_records
+    all_records = session_memo(
+        "timeline-records",
+        (
+            caregiver_a_name,
+            tuple(map(_interval_fields, caregiver_a_intervals)),
+            caregiver_b_name,
+            tuple(map(_interval_fields, caregiver_b_intervals)),
+        ),
+        lambda: build_timeline_records(
+            caregiver_a_name,
+            caregiver_a_intervals,
+            caregiver_b_name,
+            caregiver_b_intervals,
+        ),
+    )
 
     st.divider()
-    render_chart(all_records, holidays, holiday_lookup_map)
+    render_chart(all_records, holidays, covered_holiday_days)
     if st.button("Save plan for next time"):
         save_plan(
             birth_date,
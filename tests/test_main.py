@@ -0,0 +1,487 @@
+import json
+import os
+import random
+import stat
+import subprocess
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import main
+
+ROOT = Path(__file__).resolve().parent.parent
+MAIN_PATH = ROOT / "main.py"
+ICS_FIXTURES = ROOT / "assets" / "ics"
+
+
+def make_record(parent: str, label: str, start: date, end: date) -> main.LeaveRecord:
+    return main.LeaveRecord(
+        parent=parent,
+        label=label,
+        start=start,
+        end=end,
+        duration_weeks=((end - start).days + 1) / 7,
+    )
+
+
+def read_ics(name: str) -> bytes:
+    return (ICS_FIXTURES / name).read_bytes()
+
+
+def nested_loop_overlaps(caregiver_a, caregiver_b):
+    overlaps = []
+    for a_record in caregiver_a:
+        for b_record in caregiver_b:
+            start = max(a_record.start, b_record.start)
+            end = min(a_record.end, b_record.end)
+            if start <= end:
+                overlaps.append(
+                    main.LeaveRecord(
+                        parent="Overlap",
+                        label=f"{a_record.label} ∩ {b_record.label}",
+                        start=start,
+                        end=end,
+                        duration_weeks=((end - start).days + 1) / 7,
+                    )
+                )
+    return overlaps
+
+
+def sample_plan(a_name="Alex", a_weeks=8.0):
+    return {
+        "birth_date": date(2024, 3, 4),
+        "caregiver-a": [main.IntervalInput(date(2024, 3, 4), a_weeks, "Parental")],
+        "caregiver-b": [main.IntervalInput(date(2024, 4, 1), 4.0, None)],
+        "caregiver_a_name": a_name,
+        "caregiver_b_name": "Sam",
+        "holidays": [
+            make_record("Bank holidays", "Easter", date(2024, 3, 29), date(2024, 4, 1))
+        ],
+    }
+
+
+def save_plan(plan=None):
+    plan = plan or sample_plan()
+    main.save_plan(
+        plan["birth_date"],
+        plan["caregiver-a"],
+        plan["caregiver-b"],
+        plan["caregiver_a_name"],
+        plan["caregiver_b_name"],
+        plan["holidays"],
+    )
+
+
+def spans(records):
+    return [(record.label, record.start, record.end) for record in records]
+
+
+@pytest.fixture
+def plan_dir(tmp_path, monkeypatch):
+    """Run from a temp dir and return a writer for its .streamlit/last_plan.json.
+
+    The load_saved_plan cache is process-wide, so it is cleared around each test
+    to keep results from leaking between plans that share an mtime.
+    """
+    monkeypatch.chdir(tmp_path)
+    main.load_saved_plan.clear()
+
+    def write_plan(plan: dict) -> Path:
+        streamlit_dir = tmp_path / ".streamlit"
+        streamlit_dir.mkdir(exist_ok=True)
+        (streamlit_dir / "last_plan.json").write_text(json.dumps(plan))
+        return tmp_path
+
+    yield write_plan
+    main.load_saved_plan.clear()
+
+
+def test_holiday_days_expands_and_dedupes_multi_day_holidays():
+    holidays = [
+        make_record("Bank holidays", "Easter", date(2024, 3, 29), date(2024, 4, 1)),
+        make_record(
+            "Bank holidays", "Easter Monday", date(2024, 4, 1), date(2024, 4, 1)
+        ),
+        make_record("Bank holidays", "New Year", date(2024, 1, 1), date(2024, 1, 1)),
+    ]
+
+    assert main.holiday_days(holidays) == (
+        date(2024, 1, 1),
+        date(2024, 3, 29),
+        date(2024, 3, 30),
+        date(2024, 3, 31),
+        date(2024, 4, 1),
+    )
+
+
+def test_holiday_days_handles_dates_outside_pandas_timestamp_range():
+    holidays = [
+        make_record(
+            "Bank holidays", "Far future", date(2300, 12, 31), date(2301, 1, 1)
+        ),
+        make_record(
+            "Bank holidays", "Distant past", date(1600, 1, 1), date(1600, 1, 1)
+        ),
+    ]
+
+    assert main.holiday_days(holidays) == (
+        date(1600, 1, 1),
+        date(2300, 12, 31),
+        date(2301, 1, 1),
+    )
+
+
+def test_holiday_days_is_empty_without_holidays():
+    assert main.holiday_days([]) == ()
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "folding.ics",
+        "bom.ics",
+        "valarm.ics",
+        "params.ics",
+        "escapes.ics",
+        "missing_fields.ics",
+        "unicode_separators.ics",
+    ],
+)
+def test_parse_ics_fast_matches_icalendar(name):
+    raw = read_ics(name)
+
+    records = main._parse_ics_fast(raw)
+
+    assert records is not None
+    assert records == main._parse_ics_full(raw)
+
+
+@pytest.mark.parametrize("name", ["quoted_param.ics", "latin1.ics"])
+def test_parse_ics_falls_back_to_icalendar(name):
+    raw = read_ics(name)
+
+    assert main._parse_ics_fast(raw) is None
+    assert main._parse_ics_bytes(raw) == main._parse_ics_full(raw)
+
+
+def test_parse_ics_fast_unfolds_and_unescapes_summaries():
+    folded = main._parse_ics_fast(read_ics("folding.ics"))
+    escaped = main._parse_ics_fast(read_ics("escapes.ics"))
+
+    assert [record.label for record in folded] == [
+        "Tag der Deutschen Einheit",
+        "Christmas Holidays",
+    ]
+    assert [record.label for record in escaped] == [
+        "Easter Monday, observed; office closed",
+        "Ascension\nDay \\ Vatertag",
+        "Unity Day: Berlin",
+    ]
+
+
+def test_parse_ics_fast_splits_only_on_line_breaks():
+    (new_year, christmas) = main._parse_ics_fast(read_ics("unicode_separators.ics"))
+
+    assert new_year.label == (
+        "New\u2028Year\x85Day\x0cobserved\x1cclosed\x0bhere\u2029end"
+    )
+    assert (christmas.start, christmas.end) == (date(2024, 12, 25), date(2024, 12, 25))
+
+
+def test_parse_ics_fast_ignores_valarm_properties():
+    (record,) = main._parse_ics_fast(read_ics("valarm.ics"))
+
+    assert record.label == "Tag der Arbeit"
+    assert (record.start, record.end) == (date(2024, 5, 1), date(2024, 5, 1))
+
+
+def test_parse_ics_fast_handles_missing_fields():
+    records = main._parse_ics_fast(read_ics("missing_fields.ics"))
+
+    assert [(r.label, r.start, r.end) for r in records] == [
+        ("Whit Monday", date(2024, 5, 20), date(2024, 5, 20)),
+        ("Holiday 3", date(2024, 12, 31), date(2025, 1, 1)),
+    ]
+
+
+def test_overlap_detects_partial_overlap():
+    a = [make_record("A", "A1", date(2024, 1, 1), date(2024, 1, 31))]
+    b = [make_record("B", "B1", date(2024, 1, 20), date(2024, 2, 10))]
+
+    (overlap,) = main.build_overlap_records(a, b)
+
+    assert overlap.parent == "Overlap"
+    assert spans([overlap]) == [("A1 ∩ B1", date(2024, 1, 20), date(2024, 1, 31))]
+    assert overlap.duration_weeks == 12 / 7
+
+
+def test_overlap_handles_same_day_start_ties():
+    a = [make_record("A", "A1", date(2024, 3, 1), date(2024, 3, 10))]
+    b = [
+        make_record("B", "B1", date(2024, 3, 1), date(2024, 3, 3)),
+        make_record("B", "B2", date(2024, 3, 1), date(2024, 3, 20)),
+    ]
+
+    assert spans(main.build_overlap_records(a, b)) == [
+        ("A1 ∩ B1", date(2024, 3, 1), date(2024, 3, 3)),
+        ("A1 ∩ B2", date(2024, 3, 1), date(2024, 3, 10)),
+    ]
+
+
+def test_overlap_counts_touching_blocks_as_one_shared_day():
+    a = [make_record("A", "A1", date(2024, 5, 1), date(2024, 5, 10))]
+    b = [
+        make_record("B", "B1", date(2024, 5, 10), date(2024, 5, 20)),
+        make_record("B", "B2", date(2024, 5, 11), date(2024, 5, 12)),
+    ]
+
+    overlaps = main.build_overlap_records(a, b)
+
+    assert spans(overlaps) == [("A1 ∩ B1", date(2024, 5, 10), date(2024, 5, 10))]
+    assert overlaps[0].duration_weeks == 1 / 7
+
+
+def test_overlap_handles_a_caregivers_own_blocks_overlapping():
+    a = [
+        make_record("A", "A1", date(2024, 1, 1), date(2024, 3, 31)),
+        make_record("A", "A2", date(2024, 2, 1), date(2024, 2, 15)),
+    ]
+    b = [
+        make_record("B", "B1", date(2024, 2, 10), date(2024, 2, 20)),
+        make_record("B", "B2", date(2024, 2, 12), date(2024, 4, 30)),
+    ]
+
+    assert spans(main.build_overlap_records(a, b)) == [
+        ("A1 ∩ B1", date(2024, 2, 10), date(2024, 2, 20)),
+        ("A1 ∩ B2", date(2024, 2, 12), date(2024, 3, 31)),
+        ("A2 ∩ B1", date(2024, 2, 10), date(2024, 2, 15)),
+        ("A2 ∩ B2", date(2024, 2, 12), date(2024, 2, 15)),
+    ]
+
+
+@pytest.mark.parametrize("empty_side", ["a", "b", "both"])
+def test_overlap_is_empty_when_a_caregiver_has_no_blocks(empty_side):
+    blocks = [make_record("X", "X1", date(2024, 1, 1), date(2024, 1, 31))]
+    a = [] if empty_side in ("a", "both") else blocks
+    b = [] if empty_side in ("b", "both") else blocks
+
+    assert main.build_overlap_records(a, b) == []
+
+
+def test_overlap_order_matches_nested_loop():
+    rng = random.Random(20240101)
+    for _ in range(300):
+        sides = []
+        for parent in ("A", "B"):
+            blocks = []
+            for idx in range(rng.randint(0, 6)):
+                start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 60))
+                end = start + timedelta(days=rng.randint(0, 30))
+                blocks.append(make_record(parent, f"{parent}{idx}", start, end))
+            sides.append(blocks)
+
+        assert main.build_overlap_records(*sides) == nested_loop_overlaps(*sides)
+
+
+@pytest.mark.parametrize("holiday_count", [1, 40])
+def test_load_saved_plan_rejects_partial_holiday_dates(plan_dir, holiday_count):
+    holidays = [
+        {"label": f"Holiday {idx}", "start": "2024-01-01", "end": "2024-01-01"}
+        for idx in range(holiday_count - 1)
+    ]
+    holidays.append({"label": "Partial", "start": "2024-01", "end": "2024-01"})
+    plan_dir(
+        {
+            "birth_date": "2024-01-01",
+            "caregiver-a": [],
+            "caregiver-b": [],
+            "holidays": holidays,
+        }
+    )
+
+    assert main.load_saved_plan(main.PLAN_PATH.stat().st_mtime) is None
+
+
+def test_loading_plan_and_holidays_does_not_import_pandas(plan_dir):
+    workdir = plan_dir(
+        {
+            "birth_date": "2024-01-01",
+            "caregiver-a": [],
+            "caregiver-b": [],
+            "holidays": [
+                {"label": "Easter", "start": "2024-03-29", "end": "2024-04-01"}
+            ],
+        },
+    )
+    script = (
+        "import sys\n"
+        "import main\n"
+        "plan = main.load_saved_plan(main.PLAN_PATH.stat().st_mtime)\n"
+        "main.holiday_days(plan['holidays'])\n"
+        "main.parse_bank_holidays(None)\n"
+        "print('pandas' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=workdir,
+        env={**os.environ, "PYTHONPATH": str(MAIN_PATH.parent)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_rerun_reuses_memoized_records_and_holiday_days(plan_dir):
+    plan = {
+        "birth_date": "2024-03-04",
+        "caregiver-a": [
+            {"start_date": "2024-03-04", "duration_weeks": 8.0, "name": "Parental"}
+        ],
+        "caregiver-b": [
+            {"start_date": "2024-04-01", "duration_weeks": 4.0, "name": "Parental"}
+        ],
+        "caregiver_a_name": "Alex",
+        "caregiver_b_name": "Sam",
+        "holidays": [{"label": "Easter", "start": "2024-03-29", "end": "2024-04-01"}],
+    }
+    plan_dir(plan)
+
+    app = AppTest.from_file(str(MAIN_PATH)).run(timeout=30)
+    records = app.session_state["timeline-records-memo"][1]
+    days = app.session_state["holiday-days-memo"][1]
+    app.run(timeout=30)
+
+    assert not app.exception
+    assert app.session_state["timeline-records-memo"][1] is records
+    assert app.session_state["holiday-days-memo"][1] is days
+
+
+def test_unreadable_plan_shows_a_warning_instead_of_crashing(plan_dir):
+    workdir = plan_dir({})
+    plan_path = workdir / ".streamlit" / "last_plan.json"
+    plan_path.unlink()
+    plan_path.mkdir()
+
+    app = AppTest.from_file(str(MAIN_PATH)).run(timeout=30)
+
+    assert not app.exception
+    assert [warning.value for warning in app.warning] == [
+        "Saved plan could not be read. Starting with defaults."
+    ]
+
+
+def test_save_plan_uses_the_umask_default_mode_for_a_new_plan(plan_dir):
+    plan_dir({})
+    main.PLAN_PATH.unlink()
+    umask = os.umask(0o027)
+    try:
+        save_plan()
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE(main.PLAN_PATH.stat().st_mode) == 0o640
+
+
+def test_save_plan_keeps_the_mode_of_an_existing_plan(plan_dir):
+    plan_dir({})
+    main.PLAN_PATH.chmod(0o604)
+
+    save_plan()
+
+    assert stat.S_IMODE(main.PLAN_PATH.stat().st_mode) == 0o604
+
+
+def test_saved_plan_loads_back_unchanged(plan_dir):
+    plan_dir({})
+    plan = sample_plan(a_name="Zoë 张", a_weeks=12 / 7)
+
+    save_plan(plan)
+
+    assert main.load_saved_plan(main.PLAN_PATH.stat().st_mtime) == plan
+
+
+def test_stdlib_json_fallback_writes_the_same_bytes_as_orjson(plan_dir, monkeypatch):
+    assert main.orjson is not None
+    plan_dir({})
+    plan = sample_plan(a_name="Zoë 张", a_weeks=12 / 7)
+    save_plan(plan)
+    with_orjson = main.PLAN_PATH.read_bytes()
+
+    monkeypatch.setattr(main, "orjson", None)
+    save_plan(plan)
+
+    assert main.PLAN_PATH.read_bytes() == with_orjson
+
+
+def test_save_plan_leaves_no_temp_files_behind(plan_dir):
+    workdir = plan_dir({})
+
+    save_plan()
+    save_plan()
+
+    assert [path.name for path in (workdir / ".streamlit").iterdir()] == [
+        "last_plan.json"
+    ]
+
+
+def chart_fixture():
+    holidays = [
+        make_record("Bank holidays", "New Year", date(2024, 1, 1), date(2024, 1, 1)),
+        make_record("Bank holidays", "Easter", date(2024, 3, 29), date(2024, 4, 1)),
+        make_record("Bank holidays", "May Day", date(2024, 5, 1), date(2024, 5, 1)),
+    ]
+    records = [
+        make_record("A", "A1", date(2024, 3, 29), date(2024, 4, 15)),
+        make_record("B", "B1", date(2024, 3, 4), date(2024, 3, 29)),
+        make_record("B", "B2", date(2024, 6, 1), date(2024, 6, 30)),
+        make_record("Overlap", "A1 ∩ B1", date(2024, 3, 29), date(2024, 3, 29)),
+    ]
+    df, table_df = main._build_chart_frames(
+        main.LeaveColumns.from_records(records), main.holiday_days(holidays)
+    )
+    return holidays, df, table_df
+
+
+def test_chart_frames_count_holiday_days_inside_each_block():
+    _, df, table_df = chart_fixture()
+
+    assert df["holiday_count"].tolist() == [4, 1, 0, 1]
+    assert df["holiday_dates_display"].tolist() == [
+        "2024-03-29, 2024-03-30, 2024-03-31, 2024-04-01",
+        "2024-03-29",
+        "None",
+        "2024-03-29",
+    ]
+    assert table_df["holidays"].tolist() == [4, 1, 0, 1]
+    assert table_df["holiday dates"].tolist() == df["holiday_dates_display"].tolist()
+
+
+def test_holiday_markers_list_the_blocks_covering_each_holiday():
+    holidays, df, _ = chart_fixture()
+
+    markers = main._build_holiday_markers(df, holidays)
+
+    assert markers[["label", "covered_blocks"]].values.tolist() == [
+        ["Easter", "A1, B1, A1 ∩ B1"],
+        ["May Day", "None"],
+    ]
+
+
+def test_chart_frame_only_carries_fields_the_spec_reads():
+    _, df, _ = chart_fixture()
+
+    assert df.columns.tolist() == [
+        "parent",
+        "label",
+        "start",
+        "end_inclusive",
+        "weeks",
+        "days",
+        "holiday_count",
+        "holiday_dates_display",
+    ]